@@ -1,21 +1,50 @@
 import corgietc  # noqa
 import os
-import json
-import EXOSIMS.Prototypes.TargetList
-import EXOSIMS.Prototypes.TimeKeeping
-import copy
+from concurrent.futures import ProcessPoolExecutor
+import astropy.constants as const
 import astropy.units as u
 import numpy as np
 import pandas
+from corgidb._exosims_cache import get_TargetList
 from synphot import units
 
+# contrast = 10**(-0.4 * dMag) = exp(_NEG_LN10_04 * dMag)
+_NEG_LN10_04 = -0.4 * np.log(10)
 
-def gen_saturation_curves():
-    """Create a dataframe containing the data for the SaturationCurves table
+# TargetList used by _compute_mode (set per worker process by _init_worker)
+_TL = None
+
+
+def _init_worker(scriptfile):
+    """Build the TargetList used by `_compute_mode` in the current process
+
+    Args:
+        scriptfile (str):
+            Full path to EXOSIMS JSON script on disk.
 
     Returns:
-        pandas.DataFrame:
-            The final table
+        None
+
+    """
+    global _TL
+    _TL = get_TargetList(scriptfile)
+
+
+def _compute_mode(jj, npoints, Izod):
+    """Compute the saturation curve of a single observing mode
+
+    Args:
+        jj (int):
+            Index of the mode in the OpticalSystem's observingModes list
+        npoints (int):
+            Number of working angles to evaluate between the IWA and OWA
+        Izod (astropy.units.Quantity):
+            Zodiacal light intensity at the fixed target location
+
+    Returns:
+        tuple:
+            r_lamD, r_as, contrast, dMag, and t_int_hr_99percent_V5 arrays, each of
+            length npoints
 
     """
 
@@ -27,94 +56,153 @@ def gen_saturation_curves():
     deltaLam_unit = u.nm
     inv_arcsec2 = 1 / u.arcsec**2
 
+    TL = _TL
+    OS = TL.OpticalSystem
+    mode = OS.observingModes[jj]
+
+    # set fixed inputs
+    sInds = 0
+
+    # compute local zodi and exozodi
+    Izod_color = Izod * TL.ZodiacalLight.zodi_color_correction_factor(mode["lam"])
+
+    # converting flux density to PHOTLAM is a multiplication by lam/(h c), so fold
+    # all unit conversions into a single constant and scale by the wavelength
+    flux_to_PHOTLAM_per_nm = (Izod.unit * u.sr * u.nm / (const.h * const.c)).to_value(
+        units.PHOTLAM / u.ph
+    )
+    factor = mode["lam"].to_value(u.nm) * flux_to_PHOTLAM_per_nm
+
+    Izod_photons = Izod_color.value * factor * PHOTLAM_sr_decomposed_val
+
+    fZ = (
+        Izod_photons
+        / (mode["F0"].to_value(F0_unit) / mode["deltaLam"].to_value(deltaLam_unit))
+    ) * inv_arcsec2
+
+    JEZ = TL.JEZ0[mode["hex"]][sInds]
+
+    # broadcast scalar inputs to all working angles (shared by both EXOSIMS calls)
+    sInds_arr = np.full(npoints, sInds)
+    fZs = u.Quantity(np.full(npoints, fZ.value), fZ.unit, copy=False)
+    JEZs = u.Quantity(np.full(npoints, JEZ.value), JEZ.unit, copy=False)
+
+    # populate working angles
+    IWA_as = mode["IWA"].to_value(u.arcsec)
+    OWA_as = mode["OWA"].to_value(u.arcsec)
+    lamD_as = mode["syst"]["input_angle_unit_value"].to_value(u.arcsec)
+
+    r_as = np.linspace(IWA_as, OWA_as, npoints)
+    r_lamD = r_as / lamD_as
+    WAs = r_as * u.arcsec
+
+    # compute saturation dMag and contrast
+    sat_dMags = OS.calc_saturation_dMag(
+        TL,
+        sInds_arr,
+        fZs,
+        JEZs,
+        WAs,
+        mode,
+    )
+    contrast = np.exp(_NEG_LN10_04 * sat_dMags)
+
+    # compute integration time for 99% of sat dMag
+    itimes = OS.calc_intTime(
+        TL,
+        sInds_arr,
+        fZs,
+        JEZs,
+        sat_dMags * 0.99,
+        WAs,
+        mode,
+    )
+
+    return r_lamD, r_as, contrast, sat_dMags, itimes.to_value(u.hour)
+
+
+def gen_saturation_curves(nprocs=1):
+    """Create a dataframe containing the data for the SaturationCurves table
+
+    Args:
+        nprocs (int, optional):
+            Number of worker processes to use (never more than the number of
+            distinct modes). Defaults to 1 (run serially in the current process).
+            If None, use the number of CPUs. Each worker builds its own TargetList,
+            so this only pays off for expensive modes, and requires this module to
+            be importable by the workers (i.e., not run from __main__ or a
+            notebook).
+
+    Returns:
+        pandas.DataFrame:
+            The final table
+
+    """
+
     # set up objects
     scriptfile = os.path.join(
         os.environ["CORGIETC_DATA_DIR"], "scripts", "CGI_Noise.json"
     )
-    with open(scriptfile, "r") as f:
-        specs = json.loads(f.read())
-
-    TL = EXOSIMS.Prototypes.TargetList.TargetList(**copy.deepcopy(specs))
+    TL = get_TargetList(scriptfile)
     OS = TL.OpticalSystem
-
-    # set fixed inputs
-    sInds = 0
-    Izod = TL.ZodiacalLight.zodi_intensity_at_location(135 * u.deg, 30 * u.deg)
     npoints = 100
+    Izod = TL.ZodiacalLight.zodi_intensity_at_location(135 * u.deg, 30 * u.deg)
 
-    # loop through all modes and populate arrays
-    scenario_name = []
-    r_lamD = []
-    r_as = []
-    contrast = []
-    dMag = []
-    t_int_hr_99percent_V5 = []
-
+    # preallocate per-mode arrays (one row per mode)
+    nmodes = len(OS.observingModes)
+    scenario_name = np.empty((nmodes, npoints), dtype=object)
+    r_lamD = np.empty((nmodes, npoints))
+    r_as = np.empty((nmodes, npoints))
+    contrast = np.empty((nmodes, npoints))
+    dMag = np.empty((nmodes, npoints))
+    t_int_hr_99percent_V5 = np.empty((nmodes, npoints))
+    outarrs = (r_lamD, r_as, contrast, dMag, t_int_hr_99percent_V5)
+
+    # modes sharing a hex are identical, so only the first of each is evaluated
+    evaluated = {}
+    for jj, mode in enumerate(OS.observingModes):
+        scenario_name[jj] = mode["Scenario"]
+        evaluated.setdefault(mode["hex"], jj)
+    inds = list(evaluated.values())
+
+    # modes are independent, so can optionally be evaluated in parallel.  Each
+    # worker builds its own TargetList, as the mode dictionaries are not
+    # guaranteed to be picklable
+    if nprocs is None:
+        nprocs = os.cpu_count() or 1
+    nprocs = min(nprocs, len(inds))
+    if nprocs <= 1:
+        _init_worker(scriptfile)
+        results = [_compute_mode(jj, npoints, Izod) for jj in inds]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=nprocs, initializer=_init_worker, initargs=(scriptfile,)
+        ) as ex:
+            results = list(
+                ex.map(_compute_mode, inds, [npoints] * len(inds), [Izod] * len(inds))
+            )
+
+    for jj, res in zip(inds, results):
+        for arr, vals in zip(outarrs, res):
+            arr[jj] = vals
+
+    # fill in repeated modes
     for jj, mode in enumerate(OS.observingModes):
-        # compute local zodi and exozodi
-        Izod_color = Izod * TL.ZodiacalLight.zodi_color_correction_factor(mode["lam"])
-
-        factor = (
-            units.convert_flux(mode["lam"], Izod_color * u.sr, units.PHOTLAM).value
-            / Izod_color.value
-        )
-
-        Izod_photons = Izod_color.value * factor * PHOTLAM_sr_decomposed_val
-
-        fZ = (
-            Izod_photons
-            / (mode["F0"].to_value(F0_unit) / mode["deltaLam"].to_value(deltaLam_unit))
-        ) * inv_arcsec2
-
-        JEZ = TL.JEZ0[mode["hex"]][sInds]
-
-        # populate scenario name
-        scenario_name += [mode["Scenario"]] * npoints
-
-        # populate working angles
-        WAs = (
-            np.linspace(mode["IWA"].value, mode["OWA"].value, npoints)
-            * mode["IWA"].unit
-        )
-
-        r_as += WAs.to_value(u.arcsec).tolist()
-        r_lamD += (WAs / mode["syst"]["input_angle_unit_value"]).value.tolist()
-
-        # compute saturation dMag and contrast
-        sat_dMags = OS.calc_saturation_dMag(
-            TL,
-            [sInds] * len(WAs),
-            np.repeat(fZ, len(WAs)),
-            np.repeat(JEZ, len(WAs)),
-            WAs,
-            mode,
-        )
-        dMag += sat_dMags.tolist()
-        contrast += (10 ** (-0.4 * sat_dMags)).tolist()
-
-        # compute integration time for 99% of sat dMag
-        itimes = OS.calc_intTime(
-            TL,
-            [sInds] * len(WAs),
-            np.repeat(fZ, len(WAs)),
-            np.repeat(JEZ, len(WAs)),
-            sat_dMags * 0.99,
-            WAs,
-            mode,
-        )
-        t_int_hr_99percent_V5 += itimes.to_value(u.hour).tolist()
-
-        # end mode loop
+        kk = evaluated[mode["hex"]]
+        if kk != jj:
+            for arr in outarrs:
+                arr[jj] = arr[kk]
 
     out = pandas.DataFrame(
         {
-            "scenario_name": scenario_name,
-            "r_lamD": r_lamD,
-            "r_as": r_as,
-            "contrast": contrast,
-            "dMag": dMag,
-            "t_int_hr_99percent_V5": t_int_hr_99percent_V5,
-        }
+            "scenario_name": scenario_name.ravel(),
+            "r_lamD": r_lamD.ravel(),
+            "r_as": r_as.ravel(),
+            "contrast": contrast.ravel(),
+            "dMag": dMag.ravel(),
+            "t_int_hr_99percent_V5": t_int_hr_99percent_V5.ravel(),
+        },
+        copy=False,
     )
 
     return out
@@ -1,11 +1,9 @@
 import corgietc  # noqa
 import os
-import json
-import EXOSIMS.Prototypes.TargetList
-import EXOSIMS.Prototypes.TimeKeeping
-import copy
 import astropy.units as u
+import numpy as np
 import pandas
+from corgidb._exosims_cache import get_TargetList
 
 
 def gen_scenarios():
@@ -21,10 +19,7 @@ def gen_scenarios():
     scriptfile = os.path.join(
         os.environ["CORGIETC_DATA_DIR"], "scripts", "CGI_Noise.json"
     )
-    with open(scriptfile, "r") as f:
-        specs = json.loads(f.read())
-
-    TL = EXOSIMS.Prototypes.TargetList.TargetList(**copy.deepcopy(specs))
+    TL = get_TargetList(scriptfile)
     OS = TL.OpticalSystem
 
     scenario_name = []
@@ -38,32 +33,33 @@ def gen_scenarios():
     lamD_as = []
 
     for jj, mode in enumerate(OS.observingModes):
+        IWA_as = mode["IWA"].to_value(u.arcsec)
+        OWA_as = mode["OWA"].to_value(u.arcsec)
+        lamD_as_val = mode["syst"]["input_angle_unit_value"].to_value(u.arcsec)
+
         scenario_name.append(mode["Scenario"])
-        minangsep_as.append(mode["IWA"].to_value(u.arcsec))
-        maxangsep_as.append(mode["OWA"].to_value(u.arcsec))
-        lamD_as.append(mode["syst"]["input_angle_unit_value"].to_value(u.arcsec))
-        minangsep_lamD.append(
-            (mode["IWA"] / mode["syst"]["input_angle_unit_value"]).value
-        )
-        maxangsep_lamD.append(
-            (mode["OWA"] / mode["syst"]["input_angle_unit_value"]).value
-        )
+        minangsep_as.append(IWA_as)
+        maxangsep_as.append(OWA_as)
+        lamD_as.append(lamD_as_val)
+        minangsep_lamD.append(IWA_as / lamD_as_val)
+        maxangsep_lamD.append(OWA_as / lamD_as_val)
         lam.append(mode["lam"].to_value(u.nm))
         bandpass.append(mode["BW"])
         delta_lam.append(mode["deltaLam"].to_value(u.nm))
 
     out = pandas.DataFrame(
         {
-            "scenario_name": scenario_name,
-            "minangsep_lamD": minangsep_lamD,
-            "maxangsep_lamD": maxangsep_lamD,
-            "minangsep_as": minangsep_as,
-            "maxangsep_as": maxangsep_as,
-            "lam": lam,
-            "bandpass": bandpass,
-            "delta_lam": delta_lam,
-            "lamD_as": lamD_as,
-        }
+            "scenario_name": np.asarray(scenario_name, dtype=object),
+            "minangsep_lamD": np.asarray(minangsep_lamD, dtype=np.float64),
+            "maxangsep_lamD": np.asarray(maxangsep_lamD, dtype=np.float64),
+            "minangsep_as": np.asarray(minangsep_as, dtype=np.float64),
+            "maxangsep_as": np.asarray(maxangsep_as, dtype=np.float64),
+            "lam": np.asarray(lam, dtype=np.float64),
+            "bandpass": np.asarray(bandpass, dtype=np.float64),
+            "delta_lam": np.asarray(delta_lam, dtype=np.float64),
+            "lamD_as": np.asarray(lamD_as, dtype=np.float64),
+        },
+        copy=False,
     )
 
     return out
@@ -0,0 +1,45 @@
+import functools
+import json
+import os
+
+import EXOSIMS.Prototypes.TargetList
+
+
+def get_TargetList(scriptfile):
+    """Return the EXOSIMS TargetList defined by a JSON script, reusing a previously
+    constructed object if the script has not been modified since.
+
+    Args:
+        scriptfile (str):
+            Full path to EXOSIMS JSON script on disk.
+
+    Returns:
+        EXOSIMS.Prototypes.TargetList.TargetList:
+            The target list object.  This is shared between callers and should
+            not be modified.
+
+    """
+
+    return _build_TL(scriptfile, os.path.getmtime(scriptfile))
+
+
+@functools.lru_cache(maxsize=4)
+def _build_TL(scriptfile, mtime):
+    """Construct a TargetList from a JSON script
+
+    Args:
+        scriptfile (str):
+            Full path to EXOSIMS JSON script on disk.
+        mtime (float):
+            Modification time of the script. Only used as part of the cache key.
+
+    Returns:
+        EXOSIMS.Prototypes.TargetList.TargetList:
+            The target list object
+
+    """
+
+    with open(scriptfile, "r") as f:
+        specs = json.loads(f.read())
+
+    return EXOSIMS.Prototypes.TargetList.TargetList(**specs)
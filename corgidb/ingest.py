@@ -1,17 +1,53 @@
+import functools
 import getpass
 import os
 import re
 import warnings
+from collections import defaultdict
 
 import keyring
 import numpy as np
 import pandas
-from sqlalchemy import create_engine, text, types
-
-
-def gen_engine(username, db="plandb", server="127.0.0.1"):
+from sqlalchemy import bindparam, create_engine, text, types
+from sqlalchemy.dialects import mysql
+
+# matches the backtick-quoted column name at the start of a column definition
+_COLDEF_RE = re.compile(r"^`([^`]+)`")
+
+# identifiers interpolated into DDL, and foreign key specifications (Table(column))
+_IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_FOREIGNKEY_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*\([A-Za-z_][A-Za-z0-9_]*\)$")
+
+# maximum number of values (rows x columns) per multi-row INSERT, keeping each
+# statement well within MySQL's placeholder and packet size limits
+_MAX_INSERT_VALUES = 10000
+
+# SQL integer types in order of increasing size, and the (signed and unsigned)
+# ranges of all but the last
+_SQL_INT_TYPES = ("TINYINT", "SMALLINT", "INT", "BIGINT")
+_SQL_INT_MIN = np.array([-128, -32768, -2147483648])
+_SQL_INT_MAX = np.array([127, 32767, 2147483647])
+_SQL_UINT_MAX = np.array([255, 65535, 4294967295])
+
+# engines created by _cached_engine that have just been checked (and so do not
+# need to be checked again by gen_engine)
+_newly_checked = set()
+
+# portable (signed) types wide enough for each unsigned type, used by all
+# dialects other than MySQL
+_SQL_UINT_GENERIC = {
+    "TINYINT": types.SMALLINT,
+    "SMALLINT": types.INTEGER,
+    "INT": types.BIGINT,
+    "BIGINT": types.BIGINT,
+}
+
+
+def gen_engine(username, db="plandb", server="127.0.0.1", validate=True):
     """Create an SQLalcehmy engine object. Saves password in local keyring and
-    retrieves automatically for future connections.
+    retrieves automatically for future connections.  Engines are cached, so
+    repeated calls for the same username, database and server return the same
+    engine.
 
     Args:
         username (str):
@@ -20,6 +56,41 @@ def gen_engine(username, db="plandb", server="127.0.0.1"):
             database name (defaults to plandb)
         server (str):
             Address of server to connec to. Defaults to 127.0.0.1
+        validate (bool):
+            Open a connection to verify that the engine works. Defaults True.
+            Connections are always verified before a newly entered password is
+            saved to the keyring.
+
+    Returns:
+        sqlalchemy.engine.base.Engine:
+            The engine object
+
+    """
+
+    engine = _cached_engine(str(username), str(db), str(server))
+
+    # open a connection to make sure everything works (unless that was just done
+    # when creating the engine)
+    checked = engine in _newly_checked
+    _newly_checked.discard(engine)
+    if validate and not checked:
+        _check_engine(engine)
+
+    return engine
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_engine(username, db, server):
+    """Create (once per username, database and server) the engine returned by
+    `gen_engine`
+
+    Args:
+        username (str):
+            username
+        db (str):
+            database name
+        server (str):
+            Address of server to connec to
 
     Returns:
         sqlalchemy.engine.base.Engine:
@@ -42,17 +113,32 @@ def gen_engine(username, db="plandb", server="127.0.0.1"):
         pool_pre_ping=True,
     )
 
-    # open a connection to make sure everything works
-    connection = engine.connect()
-    _ = connection.execute(text("SHOW TABLES"))
-    connection.close()
-
+    # only save new passwords once we know they work
     if newpass:
+        _check_engine(engine)
+        _newly_checked.add(engine)
         keyring.set_password(f"plandb_{server}_login", username, passwd)
 
     return engine
 
 
+def _check_engine(engine):
+    """Open a connection to verify that an engine works
+
+    Args:
+        engine (sqlalchemy.engine.base.Engine):
+            Engine to check
+
+    Returns:
+        None
+
+    """
+
+    connection = engine.connect()
+    _ = connection.execute(text("SHOW TABLES"))
+    connection.close()
+
+
 def proc_col_req(fname, engine, comment="#"):
     """Process new table/key request spreadsheet
 
@@ -67,15 +153,25 @@ def proc_col_req(fname, engine, comment="#"):
     Raises:
         NotImplementedError:
             For unsupported filetypes
+        ValueError:
+            For table or column names that are not valid SQL identifiers
 
     """
 
     # read in column description
     ext = os.path.splitext(fname)[-1].split(os.extsep)[-1].lower()
+    # boolean columns are parsed directly as (nullable) booleans
+    dtype = {"NEW_KEY": "boolean", "INDEX": "boolean"}
     if ext == "csv":
-        data = pandas.read_csv(fname, comment=comment)
+        data = pandas.read_csv(fname, comment=comment, dtype=dtype)
     elif ext in ["xlsx", "xls"]:
-        data = pandas.read_excel(fname, comment=comment)
+        # prefer the (much faster) calamine reader if it is available
+        try:
+            data = pandas.read_excel(
+                fname, comment=comment, dtype=dtype, engine="calamine"
+            )
+        except ImportError:
+            data = pandas.read_excel(fname, comment=comment, dtype=dtype)
     else:
         raise NotImplementedError("Filetype must be csv, xls or xlsx.")
 
@@ -101,111 +197,212 @@ def proc_col_req(fname, engine, comment="#"):
         "INDEX",
     ]
 
-    assert (
-        len(set(data.columns).symmetric_difference(expected_cols)) == 0
-    ), f'Input data must contain the columns: {", ".join(expected_cols)} ONLY'
+    assert data.columns.symmetric_difference(
+        expected_cols
+    ).empty, f'Input data must contain the columns: {", ".join(expected_cols)} ONLY'
 
     # fill in missing DB cols for boolean keys
     for boolkey in ["NEW_KEY", "INDEX"]:
-        with pandas.option_context("future.no_silent_downcasting", True):
-            data[boolkey] = data[boolkey].fillna(False).infer_objects(copy=False)
+        data[boolkey] = data[boolkey].fillna(False).astype(bool)
 
     # new keys without db_colname entries should use my_colname
-    inds = (data["NEW_KEY"]) & (data["DB_COLNAME"].isna())
-    data.loc[inds, "DB_COLNAME"] = data.loc[inds, "MY_COLNAME"]
+    db_col = data["DB_COLNAME"].to_numpy(dtype=object, copy=True)
+    inds = data["NEW_KEY"].to_numpy() & pandas.isna(db_col)
+    db_col[inds] = data["MY_COLNAME"].to_numpy(dtype=object)[inds]
 
     # sanitize column names
     # remove periods form db colnames
-    data["DB_COLNAME"] = data["DB_COLNAME"].str.replace(".", "p")
+    data["DB_COLNAME"] = pandas.Series(db_col, index=data.index).str.replace(".", "p")
 
     # change any STRING datatypes to VARCHAR
-    data.loc[data["SQL_DATATYPE"] == "STRING", "SQL_DATATYPE"] = "TEXT"
+    sql_dtype = data["SQL_DATATYPE"].to_numpy(dtype=object, copy=True)
+    sql_dtype[sql_dtype == "STRING"] = "TEXT"
+    data["SQL_DATATYPE"] = sql_dtype
 
     # verify that all rows are complete
     assert not (data[reqcols].isna().values.any()), "Input data is missing entries."
 
     # find all requested tables
-    req_tables = data["TABLE"].unique()
+    req_tables = pandas.Index(data["TABLE"].unique())
 
-    # grab all relevant tables and their current contents
-    connection = engine.connect()
-    tables = connection.execute(text("SHOW TABLES")).all()
-    tables = [t[0] for t in tables]
-
-    # these are the tables we are augmenting
-    existing_tables = list(set(req_tables).intersection(tables))
-
-    existing_keys = {}
-    for t in existing_tables:
-        tmp = connection.execute(text(f"SHOW COLUMNS IN {t}")).all()
-        existing_keys[t] = np.array([k[0] for k in tmp])
-
-    # identify all new requested keys and augemnt the tables
-    for t in existing_tables:
-        tmp = data.loc[data["TABLE"] == t]
-        newkeys = tmp.loc[~tmp["DB_COLNAME"].isin(existing_keys[t])]
-        assert newkeys["NEW_KEY"].all(), (
-            f"Some keys requested for table {t} do not exist in DB, "  # noqa
-            "but are not marked as new."
-        )
+    # these are all interpolated directly into DDL statements
+    _check_identifiers(req_tables)
+    _check_identifiers(data["DB_COLNAME"])
 
-        for jj, row in newkeys.iterrows():
-            if pandas.isna(row.SQL_DATATYPE):
-                print(f"No datatype available for {row.DB_COLNAME}")
-                continue
-            comm = (
-                f"""ALTER TABLE {t} ADD COLUMN {row.DB_COLNAME} {row.SQL_DATATYPE} """
-                f"""COMMENT "{row.DESCRIPTION}";"""  # noqa
+    # split the requests by table
+    groups = dict(list(data.groupby("TABLE", sort=False)))
+
+    # grab all relevant tables and their current contents
+    with engine.begin() as connection:
+        cols = connection.execute(
+            text(
+                "SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.COLUMNS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN :tables"
+            ).bindparams(bindparam("tables", expanding=True)),
+            {"tables": list(req_tables)},
+        ).all()
+        existing_keys = defaultdict(list)
+        for t, col in cols:
+            existing_keys[t].append(col)
+
+        # these are the tables we are augmenting
+        existing_tables = req_tables.intersection(list(existing_keys), sort=False)
+
+        # identify all new requested keys and augemnt the tables
+        for t in existing_tables:
+            tmp = groups[t]
+            newkeys = tmp.loc[~tmp["DB_COLNAME"].isin(existing_keys[t])]
+            assert newkeys["NEW_KEY"].all(), (
+                f"Some keys requested for table {t} do not exist in DB, "  # noqa
+                "but are not marked as new."
             )
 
+            # skip any new keys without datatypes
+            nodtype = newkeys["SQL_DATATYPE"].isna()
+            for col in newkeys.loc[nodtype, "DB_COLNAME"]:
+                print(f"No datatype available for {col}")
+            newkeys = newkeys.loc[~nodtype]
+
+            # add all new columns, indexes and foreign keys in a single ALTER
+            alter_parts = [f"ADD COLUMN {d}" for d in _col_defs(newkeys)]
+            alter_parts += [f"ADD {d}" for d in _key_defs(tmp)]
+
+            if len(alter_parts) > 0:
+                comm = f"ALTER TABLE {t} {', '.join(alter_parts)};"  # noqa
+                _ = connection.execute(text(comm))
+
+        # these are the new tables
+        new_tables = req_tables.difference(existing_tables, sort=False)
+
+        for t in new_tables:
+            tmp = groups[t]
+
+            # skip any columns without datatypes
+            nodtype = tmp["SQL_DATATYPE"].isna()
+            for col in tmp.loc[nodtype, "DB_COLNAME"]:
+                print(f"No datatype available for {col}")
+
+            # generate create table text, including any indexes and foreign keys
+            txt = _col_defs(tmp.loc[~nodtype]) + _key_defs(tmp)
+
+            comm = f"CREATE TABLE {t} ({', '.join(txt)});"  # noqa
+
             _ = connection.execute(text(comm))
 
-        # add any requested indexes and foreignkeys
-        indexes = tmp.loc[tmp["INDEX"], "DB_COLNAME"].values
-        if len(indexes) > 0:
-            add_indexes(connection, t, indexes)
-
-        foreignkeys = tmp.loc[~tmp["FOREIGNKEY"].isna()]
-        if len(foreignkeys) > 0:
-            add_foreignkeys(
-                connection,
-                t,
-                foreignkeys["DB_COLNAME"].values,
-                foreignkeys["FOREIGNKEY"].values,
-            )
 
-    # these are the new tables
-    new_tables = list(set(req_tables) - set(existing_tables))
+def _check_identifiers(names, pattern=_IDENTIFIER_RE):
+    """Verify that names are safe to interpolate into SQL statements
 
-    for t in new_tables:
-        tmp = data.loc[data["TABLE"] == t]
+    Args:
+        names (iterable):
+            Names to check
+        pattern (re.Pattern):
+            Pattern that all names must match. Defaults to plain SQL identifiers.
 
-        # generate create table text
-        txt = []
-        for jj, row in tmp.iterrows():
-            txt.append(
-                f'''{row.DB_COLNAME} {row.SQL_DATATYPE} COMMENT "{row.DESCRIPTION}"'''
-            )
+    Raises:
+        ValueError:
+            If any names do not match the pattern
 
-        comm = f"CREATE TABLE {t} ({', '.join(txt)});"  # noqa
+    """
 
-        _ = connection.execute(text(comm))
+    bad = [str(n) for n in names if not pattern.match(str(n))]
+    if len(bad) > 0:
+        raise ValueError(f"Invalid SQL identifiers: {', '.join(bad)}")
 
-        indexes = tmp.loc[tmp["INDEX"], "DB_COLNAME"].values
-        if len(indexes) > 0:
-            add_indexes(connection, t, indexes)
-
-        foreignkeys = tmp.loc[~tmp["FOREIGNKEY"].isna()]
-        if len(foreignkeys) > 0:
-            add_foreignkeys(
-                connection,
-                t,
-                foreignkeys["DB_COLNAME"].values,
-                foreignkeys["FOREIGNKEY"].values,
-            )
 
+def _col_defs(tmp):
+    """Generate column definitions for rows of a column request spreadsheet
+
+    Args:
+        tmp (pandas.DataFrame):
+            Rows of the column request spreadsheet
+
+    Returns:
+        list:
+            Column definitions of the form 'name TYPE COMMENT "description"'. The
+            COMMENT clause is omitted for rows without a description.
+
+    """
+
+    # descriptions may be read as floats if they are all missing
+    comment = (' COMMENT "' + tmp["DESCRIPTION"].astype("string") + '"').fillna("")
+
+    return (
+        tmp["DB_COLNAME"] + " " + tmp["SQL_DATATYPE"].astype("string") + comment
+    ).tolist()
+
+
+def _key_defs(tmp):
+    """Generate index and foreign key definitions requested for one table
+
+    Args:
+        tmp (pandas.DataFrame):
+            Rows of the column request spreadsheet belonging to a single table
+
+    Returns:
+        list:
+            Index and foreign key definitions, suitable for use in a CREATE TABLE
+            statement or (prefixed by ADD) an ALTER TABLE statement
+
+    """
+
+    defs = []
+    indexes = tmp.loc[tmp["INDEX"], "DB_COLNAME"].values
+    if len(indexes) > 0:
+        defs.append(_index_def(indexes))
+
+    foreignkeys = tmp.loc[~tmp["FOREIGNKEY"].isna()]
+    defs += _foreignkey_defs(
+        foreignkeys["DB_COLNAME"].values, foreignkeys["FOREIGNKEY"].values
+    )
+
+    return defs
+
+
+def _index_def(indexes):
+    """Generate an index definition
+
+    Args:
+        indexes (list):
+            List of columnnames to make into indexes
+
+    Returns:
+        str:
+            Index definition
+
+    """
+
+    _check_identifiers(indexes)
 
-def gen_Scenarios_table(data, schema, engine):
+    return f"INDEX ({', '.join(indexes)})"
+
+
+def _foreignkey_defs(cols, foreignkeys):
+    """Generate foreign key constraint definitions
+
+    Args:
+        cols (list):
+            List of columnnames to add as foreignkeys
+        foreignkeys (list):
+            List of foreign key specifications of the form "Table(column)"
+
+    Returns:
+        list:
+            Foreign key definitions
+
+    """
+
+    _check_identifiers(cols)
+    _check_identifiers(foreignkeys, pattern=_FOREIGNKEY_RE)
+
+    return [
+        f"FOREIGN KEY ({col}) REFERENCES {fkey} ON DELETE NO ACTION "
+        "ON UPDATE NO ACTION"
+        for col, fkey in zip(cols, foreignkeys)
+    ]
+
+
+def gen_Scenarios_table(data, schema, engine, chunksize=None, method="multi"):
     """Populates the Scenarios table.
 
     Args:
@@ -215,29 +412,22 @@ def gen_Scenarios_table(data, schema, engine):
             Table of column names ('Column') and comments ('Comments')
         engine (sqlalchemy.engine.base.Engine):
             Engine
+        chunksize (int, optional):
+            Number of rows to insert per statement. Defaults to as many rows as
+            fit in _MAX_INSERT_VALUES values.
+        method (str or callable, optional):
+            Insertion method passed to `pandas.DataFrame.to_sql`. Defaults to
+            "multi" (multi-row INSERT statements).
 
     Returns:
         None
 
     """
-    connection = engine.connect()
-    namemxchar = np.array([len(n) for n in data["scenario_name"].values]).max()
-
-    _ = data.to_sql(
-        "Scenarios",
-        connection,
-        chunksize=100,
-        if_exists="replace",
-        dtype={
-            "scenario_name": types.String(namemxchar),
-        },
-        index=False,
-    )
 
-    updateSQLschema(connection, "Scenarios", schema)
+    _write_scenario_table("Scenarios", data, schema, engine, chunksize, method)
 
 
-def gen_SaturationCurves_table(data, schema, engine):
+def gen_SaturationCurves_table(data, schema, engine, chunksize=None, method="multi"):
     """Populate SaturationCurves table
 
     Args:
@@ -247,26 +437,60 @@ def gen_SaturationCurves_table(data, schema, engine):
             Table of column names ('Column') and comments ('Comments')
         engine (sqlalchemy.engine.base.Engine):
             Engine
+        chunksize (int, optional):
+            Number of rows to insert per statement. Defaults to as many rows as
+            fit in _MAX_INSERT_VALUES values.
+        method (str or callable, optional):
+            Insertion method passed to `pandas.DataFrame.to_sql`. Defaults to
+            "multi" (multi-row INSERT statements).
 
     Returns:
         None
 
     """
-    connection = engine.connect()
-    namemxchar = np.array([len(n) for n in data["scenario_name"].values]).max()
-
-    _ = data.to_sql(
-        "SaturationCurves",
-        connection,
-        chunksize=100,
-        if_exists="replace",
-        dtype={
-            "scenario_name": types.String(namemxchar),
-        },
-        index=False,
-    )
 
-    updateSQLschema(connection, "SaturationCurves", schema)
+    _write_scenario_table("SaturationCurves", data, schema, engine, chunksize, method)
+
+
+def _write_scenario_table(tablename, data, schema, engine, chunksize, method):
+    """Replace a table with new data and update its schema. Column types are
+    inferred with `get_optimal_sql_datatypes`.
+
+    Args:
+        tablename (str):
+            Name of table
+        data (pandas.DataFrame):
+            Table data
+        schema (pandas.DataFrame):
+            Table of column names ('Column') and comments ('Comments')
+        engine (sqlalchemy.engine.base.Engine):
+            Engine
+        chunksize (int or None):
+            Number of rows to insert per statement. If None, use as many rows as
+            fit in _MAX_INSERT_VALUES values.
+        method (str or callable):
+            Insertion method passed to `pandas.DataFrame.to_sql`
+
+    Returns:
+        None
+
+    """
+    dtype = get_sqlalchemy_types(get_optimal_sql_datatypes(data))
+    if chunksize is None:
+        chunksize = max(1, _MAX_INSERT_VALUES // len(data.columns))
+
+    with engine.begin() as connection:
+        _ = data.to_sql(
+            tablename,
+            connection,
+            chunksize=chunksize,
+            method=method,
+            if_exists="replace",
+            dtype=dtype,
+            index=False,
+        )
+
+        updateSQLschema(connection, tablename, schema)
 
 
 def add_indexes(connection, tablename, indexes):
@@ -285,9 +509,7 @@ def add_indexes(connection, tablename, indexes):
 
     """
 
-    _ = connection.execute(
-        text(f"ALTER TABLE {tablename} ADD INDEX ({', '.join(indexes)})")
-    )
+    _ = connection.execute(text(f"ALTER TABLE {tablename} ADD {_index_def(indexes)}"))
 
 
 def add_foreignkeys(connection, tablename, cols, foreignkeys):
@@ -309,14 +531,11 @@ def add_foreignkeys(connection, tablename, cols, foreignkeys):
 
     """
 
-    for col, fkey in zip(cols, foreignkeys):
-        _ = connection.execute(
-            text(
-                f"ALTER TABLE {tablename} ADD FOREIGN KEY ({col}) "
-                f"REFERENCES {fkey} ON DELETE NO ACTION "
-                "ON UPDATE NO ACTION"
-            )
-        )
+    clauses = [f"ADD {d}" for d in _foreignkey_defs(cols, foreignkeys)]
+    if len(clauses) == 0:
+        return
+
+    _ = connection.execute(text(f"ALTER TABLE {tablename} {', '.join(clauses)}"))
 
 
 def updateSQLschema(connection, tablename, schema):
@@ -356,23 +575,18 @@ def updateSQLschema(connection, tablename, schema):
     res = res[0][1]
     res = res.split("\n")
 
-    # define regex for parsing col defs
-    p = re.compile(r"`(\S+)`[\s\S]+")
-
-    # loop through and find all col definitions without comments
+    # find all col definitions without comments
+    lines = [r for r in (r.strip().strip(",") for r in res) if "COMMENT" not in r]
     keys = []
     defs = []
-    for r in res:
-        r = r.strip().strip(",")
-        if "COMMENT" in r:
-            continue
-        m = p.match(r)
-        if m:
-            keys.append(m.groups()[0])
-            defs.append(r)
+    for m in filter(None, map(_COLDEF_RE.match, lines)):
+        keys.append(m.group(1))
+        defs.append(m.string)
 
     # compare schema and table
-    missing_from_schema = list(set(keys) - set(schema["Column"].values))
+    missing_from_schema = np.setdiff1d(
+        keys, schema["Column"].values, assume_unique=True
+    )
     if len(missing_from_schema) > 0:
         warnings.warn(
             (
@@ -381,11 +595,8 @@ def updateSQLschema(connection, tablename, schema):
             )
         )
 
-    missing_from_table = list(set(schema["Column"].values) - set(keys))
+    missing_from_table = np.setdiff1d(schema["Column"].values, keys, assume_unique=True)
     if len(missing_from_table) > 0:
-        schema = schema.loc[~schema["Column"].isin(missing_from_table)].reset_index(
-            drop=True
-        )
         warnings.warn(
             (
                 "Columns present in schema but missing from table (or already have "
@@ -393,11 +604,16 @@ def updateSQLschema(connection, tablename, schema):
             )
         )
 
-    for key, d in zip(keys, defs):
-        comm = (
-            f"ALTER TABLE `{tablename}` CHANGE `{key}` {d} COMMENT "
-            f'"{schema.loc[schema["Column"] == key, "Comments"].values[0]}";'  # noqa
-        )
+    # update all column comments in a single ALTER statement (only columns in
+    # both the table and the schema are looked up)
+    comments_by_col = dict(zip(schema["Column"].values, schema["Comments"].values))
+    clauses = [
+        f'CHANGE `{key}` {d} COMMENT "{comments_by_col[key]}"'
+        for key, d in zip(keys, defs)
+        if key in comments_by_col
+    ]
+    if len(clauses) > 0:
+        comm = f"ALTER TABLE `{tablename}` {', '.join(clauses)};"  # noqa
         _ = connection.execute(text(comm))
 
 
@@ -412,29 +628,48 @@ def get_optimal_sql_datatypes(df: pandas.DataFrame) -> dict:
             A dictionary mapping column names to optimal SQL datatypes.
     """
     col_types = {}
-    for col in df.columns:
-        dtype = df[col].dtype
-        if np.issubdtype(dtype, np.integer):
-            min_val, max_val = df[col].min(), df[col].max()
-            if -128 <= min_val and max_val <= 127:
-                col_types[col] = "TINYINT"
-            elif -32768 <= min_val and max_val <= 32767:
-                col_types[col] = "SMALLINT"
-            elif -2147483648 <= min_val and max_val <= 2147483647:
-                col_types[col] = "INT"
-            else:
-                col_types[col] = "BIGINT"
-        elif np.issubdtype(dtype, np.floating):
-            col_types[col] = "DOUBLE"
-        elif dtype == np.bool_:
-            col_types[col] = "BOOLEAN"
-        else:
-            max_len = df[col].str.len().max()
+
+    # integer columns: pick the smallest type whose range covers [min, max],
+    # i.e., the number of type boundaries the column's range exceeds. Columns
+    # with no negative values use unsigned types. The type boundaries are all
+    # exactly representable as floats, so comparing in floating point is exact.
+    int_df = df.select_dtypes(include="integer")
+    if len(int_df.columns) > 0:
+        mins = int_df.min().to_numpy(dtype=float, na_value=np.nan)
+        maxs = int_df.max().to_numpy(dtype=float, na_value=np.nan)
+        unsigned = mins >= 0
+        tiers = np.where(
+            unsigned,
+            (maxs[:, None] > _SQL_UINT_MAX).sum(axis=1),
+            np.maximum(
+                (mins[:, None] < _SQL_INT_MIN).sum(axis=1),
+                (maxs[:, None] > _SQL_INT_MAX).sum(axis=1),
+            ),
+        )
+        # empty and all-null columns have no range, so use the largest type
+        tiers[np.isnan(mins) | np.isnan(maxs)] = len(_SQL_INT_TYPES) - 1
+        for col, tier, uns in zip(int_df.columns, tiers, unsigned):
+            col_types[col] = _SQL_INT_TYPES[tier] + (" UNSIGNED" if uns else "")
+
+    # single precision floats can be stored as FLOAT without loss
+    for col, dtype in df.select_dtypes(include="floating").dtypes.items():
+        col_types[col] = "FLOAT" if dtype.itemsize <= 4 else "DOUBLE"
+
+    bool_cols = df.select_dtypes(include="bool").columns
+    col_types.update(dict.fromkeys(bool_cols, "BOOLEAN"))
+
+    # everything else is treated as strings
+    str_cols = df.columns.difference(list(col_types), sort=False)
+    if len(str_cols) > 0:
+        max_lens = df[str_cols].apply(lambda s: s.str.len()).max()
+        for col, max_len in max_lens.items():
             if pandas.isna(max_len):
                 col_types[col] = "VARCHAR(255)"
             else:
                 col_types[col] = f"VARCHAR({int(max_len)})"
-    return col_types
+
+    # preserve the original column order
+    return {col: col_types[col] for col in df.columns}
 
 
 def get_sqlalchemy_types(col_types: dict) -> dict:
@@ -446,17 +681,29 @@ def get_sqlalchemy_types(col_types: dict) -> dict:
 
     Returns:
         dict:
-            Equivalent dictionary but with values all from sqlachemy.typs
+            Equivalent dictionary but with values all from sqlachemy.typs.
+            Unsigned integers are only unsigned on MySQL, and use the next larger
+            signed type on other dialects (BIGINT UNSIGNED values above the
+            BIGINT range cannot be stored there).
 
     """
 
-    p = re.compile(r"^([A-Za-z]+)(?:\((\d+)\))?$")
+    p = re.compile(r"^([A-Za-z]+)(?:\((\d+)\))?( UNSIGNED)?$")
     for key in col_types:
         if col_types[key] == 'TINYINT':
             col_types[key] = types.SmallInteger
             continue
 
         tmp = p.match(col_types[key])
+
+        # unsigned integers are only available as MySQL-specific types
+        if tmp.group(3) is not None:
+            name = "INTEGER" if tmp.group(1) == "INT" else tmp.group(1)
+            col_types[key] = _SQL_UINT_GENERIC[tmp.group(1)]().with_variant(
+                getattr(mysql, name)(unsigned=True), "mysql"
+            )
+            continue
+
         val = getattr(types, tmp.group(1))
         if tmp.group(2) is not None:
             val = val(int(tmp.group(2)))
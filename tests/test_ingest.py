@@ -0,0 +1,433 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas
+from sqlalchemy import Column, MetaData, Table, create_engine, types
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.schema import CreateTable
+
+from corgidb import ingest
+
+
+class _Result:
+    """Minimal stand-in for a sqlalchemy result"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def fetchall(self):
+        return self.rows
+
+
+class _Connection:
+    """Records executed statements and reports existing table columns (and a
+    canned table definition for SHOW CREATE TABLE)"""
+
+    def __init__(self, existing, create_table=None):
+        self.existing = existing
+        self.create_table = create_table
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        statement = str(statement)
+        self.statements.append(statement)
+        if "information_schema" in statement:
+            return _Result(
+                [
+                    (t, c)
+                    for t, cols in self.existing.items()
+                    if t in params["tables"]
+                    for c in cols
+                ]
+            )
+        if "show create table" in statement.lower():
+            return _Result([(statement.split()[-1], self.create_table)])
+        return _Result([])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class _Engine:
+    """Engine returning a single recording connection"""
+
+    def __init__(self, existing=None):
+        self.connection = _Connection(existing or {})
+
+    def begin(self):
+        return self.connection
+
+
+class TestGenEngine(unittest.TestCase):
+    """Tests for ingest.gen_engine"""
+
+    def setUp(self):
+        ingest._cached_engine.cache_clear()
+        self.addCleanup(ingest._cached_engine.cache_clear)
+        for name in ["keyring", "getpass", "create_engine", "_check_engine"]:
+            patcher = mock.patch.object(ingest, name)
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+        self.create_engine.side_effect = lambda *args, **kwargs: mock.Mock()
+
+    def test_cache(self):
+        """Equivalent calls return the same engine with one keyring lookup"""
+
+        self.keyring.get_password.return_value = "passwd"
+        engine = ingest.gen_engine("user")
+        self.assertIs(ingest.gen_engine("user", "plandb"), engine)
+        self.assertIs(ingest.gen_engine(username="user", validate=False), engine)
+        self.assertIs(ingest.gen_engine("user", server="127.0.0.1"), engine)
+        self.assertIsNot(ingest.gen_engine("user", "other"), engine)
+
+        self.assertEqual(self.keyring.get_password.call_count, 2)
+        self.assertEqual(self.create_engine.call_count, 2)
+        self.assertEqual(self._check_engine.call_count, 4)
+
+    def test_new_password(self):
+        """New passwords are checked once before being saved"""
+
+        self.keyring.get_password.return_value = None
+        self.getpass.getpass.return_value = "passwd"
+        engine = ingest.gen_engine("user")
+        self._check_engine.assert_called_once_with(engine)
+        self.keyring.set_password.assert_called_once_with(
+            "plandb_127.0.0.1_login", "user", "passwd"
+        )
+
+        ingest.gen_engine("user")
+        self.assertEqual(self._check_engine.call_count, 2)
+
+
+class TestProcColReq(unittest.TestCase):
+    """Tests for ingest.proc_col_req"""
+
+    def run_request(self, rows, existing=None, engine=None):
+        header = (
+            "MY_COLNAME,DB_COLNAME,TABLE,UNITS,NEW_KEY,DESCRIPTION,SQL_DATATYPE,"
+            "INDEX,FOREIGNKEY"
+        )
+        if engine is None:
+            engine = _Engine(existing)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "request.csv")
+            with open(fname, "w") as f:
+                f.write("\n".join([header] + rows) + "\n")
+            ingest.proc_col_req(fname, engine)
+
+        return engine.connection.statements[1:]
+
+    def test_invalid_identifiers(self):
+        """Invalid names raise before any DDL is executed"""
+
+        for row in [
+            "a,a,Stars; DROP TABLE Stars,,TRUE,Column a,INT,,",
+            "a,a b,Stars,,TRUE,Column a,INT,,",
+            "a,a,Stars,,TRUE,Column a,INT,,Stars(st_id); DROP",
+        ]:
+            for existing in [{}, {"Stars": ["st_id"]}]:
+                engine = _Engine(existing)
+                with self.assertRaises(ValueError, msg=row):
+                    self.run_request([row], engine=engine)
+                self.assertEqual(
+                    [s for s in engine.connection.statements if "SELECT" not in s],
+                    [],
+                    msg=row,
+                )
+
+    def test_missing_description(self):
+        """Rows without a description get no COMMENT clause"""
+
+        statements = self.run_request(
+            [
+                "a,a,Stars,,TRUE,,INT,,",
+                "b,b,Stars,,TRUE,Column b,DOUBLE,,",
+            ]
+        )
+        self.assertEqual(
+            statements, ['CREATE TABLE Stars (a INT, b DOUBLE COMMENT "Column b");']
+        )
+
+        statements = self.run_request(
+            ["a,a,Stars,,TRUE,,INT,,"], existing={"Stars": ["st_id"]}
+        )
+        self.assertEqual(statements, ["ALTER TABLE Stars ADD COLUMN a INT;"])
+
+    def test_missing_datatype(self):
+        """Rows without a datatype are skipped"""
+
+        statements = self.run_request(
+            [
+                "a,a,Stars,,TRUE,Column a,,,",
+                "b,b,Stars,,TRUE,Column b,DOUBLE,,",
+            ]
+        )
+        self.assertEqual(
+            statements, ['CREATE TABLE Stars (b DOUBLE COMMENT "Column b");']
+        )
+
+
+class TestAddForeignkeys(unittest.TestCase):
+    """Tests for ingest.add_foreignkeys"""
+
+    def test_no_foreignkeys(self):
+        """No statement is executed when there are no foreign keys"""
+
+        connection = _Connection({})
+        ingest.add_foreignkeys(connection, "Stars", [], [])
+        self.assertEqual(connection.statements, [])
+
+    def test_foreignkeys(self):
+        """All foreign keys are added in a single statement"""
+
+        connection = _Connection({})
+        ingest.add_foreignkeys(
+            connection, "Stars", ["st_id", "pl_id"], ["Hosts(st_id)", "Pl(pl_id)"]
+        )
+        self.assertEqual(len(connection.statements), 1)
+        self.assertTrue(connection.statements[0].startswith("ALTER TABLE Stars ADD"))
+        self.assertEqual(connection.statements[0].count("FOREIGN KEY"), 2)
+
+    def test_invalid_foreignkeys(self):
+        """Invalid columns and foreign keys raise before any DDL is executed"""
+
+        connection = _Connection({})
+        with self.assertRaises(ValueError):
+            ingest.add_foreignkeys(
+                connection, "Stars", ["st_id"], ["Stars(st_id); DROP"]
+            )
+        with self.assertRaises(ValueError):
+            ingest.add_foreignkeys(connection, "Stars", ["st id"], ["Stars(st_id)"])
+        self.assertEqual(connection.statements, [])
+
+
+class TestAddIndexes(unittest.TestCase):
+    """Tests for ingest.add_indexes"""
+
+    def test_invalid_indexes(self):
+        """Invalid column names raise before any DDL is executed"""
+
+        connection = _Connection({})
+        with self.assertRaises(ValueError):
+            ingest.add_indexes(connection, "Stars", ["st_id", "st_id); DROP TABLE x;"])
+        self.assertEqual(connection.statements, [])
+
+
+class TestGetOptimalSQLDatatypes(unittest.TestCase):
+    """Tests for ingest.get_optimal_sql_datatypes"""
+
+    def check_int(self, vals, expected):
+        df = pandas.DataFrame({"a": np.array(vals, dtype=np.int64)})
+        self.assertEqual(
+            ingest.get_optimal_sql_datatypes(df), {"a": expected}, msg=str(vals)
+        )
+
+    def test_signed_tiers(self):
+        """Signed types are chosen by the column's range"""
+
+        self.check_int([-1, 127], "TINYINT")
+        self.check_int([-128, 0], "TINYINT")
+        self.check_int([-1, 128], "SMALLINT")
+        self.check_int([-129, 0], "SMALLINT")
+        self.check_int([-1, 32767], "SMALLINT")
+        self.check_int([-32768, 0], "SMALLINT")
+        self.check_int([-1, 32768], "INT")
+        self.check_int([-32769, 0], "INT")
+        self.check_int([-1, 2147483647], "INT")
+        self.check_int([-2147483648, 0], "INT")
+        self.check_int([-1, 2147483648], "BIGINT")
+        self.check_int([-2147483649, 0], "BIGINT")
+
+    def test_unsigned_tiers(self):
+        """Columns without negative values use unsigned types"""
+
+        self.check_int([0, 255], "TINYINT UNSIGNED")
+        self.check_int([0, 256], "SMALLINT UNSIGNED")
+        self.check_int([0, 65535], "SMALLINT UNSIGNED")
+        self.check_int([0, 65536], "INT UNSIGNED")
+        self.check_int([0, 4294967295], "INT UNSIGNED")
+        self.check_int([0, 4294967296], "BIGINT UNSIGNED")
+
+        df = pandas.DataFrame({"a": np.array([0, 2**64 - 1], dtype=np.uint64)})
+        self.assertEqual(ingest.get_optimal_sql_datatypes(df), {"a": "BIGINT UNSIGNED"})
+
+    def test_empty_and_null(self):
+        """Columns without values fall back to the largest types"""
+
+        df = pandas.DataFrame(
+            {
+                "int": pandas.Series([], dtype=np.int64),
+                "float": pandas.Series([], dtype=np.float64),
+                "str": pandas.Series([], dtype=object),
+            }
+        )
+        self.assertEqual(
+            ingest.get_optimal_sql_datatypes(df),
+            {"int": "BIGINT", "float": "DOUBLE", "str": "VARCHAR(255)"},
+        )
+
+        df = pandas.DataFrame(
+            {
+                "int": pandas.Series([None, None], dtype="Int64"),
+                "float": [np.nan, np.nan],
+                "str": [None, None],
+            }
+        )
+        self.assertEqual(
+            ingest.get_optimal_sql_datatypes(df),
+            {"int": "BIGINT", "float": "DOUBLE", "str": "VARCHAR(255)"},
+        )
+
+    def test_other_types(self):
+        """Floats, booleans and strings, in the original column order"""
+
+        df = pandas.DataFrame(
+            {
+                "s": ["a", "bcd"],
+                "f64": [1.0, 2.0],
+                "b": [True, False],
+                "f32": np.array([1.0, 2.0], dtype=np.float32),
+            }
+        )
+        res = ingest.get_optimal_sql_datatypes(df)
+        self.assertEqual(list(res), ["s", "f64", "b", "f32"])
+        self.assertEqual(
+            res,
+            {"s": "VARCHAR(3)", "f64": "DOUBLE", "b": "BOOLEAN", "f32": "FLOAT"},
+        )
+
+
+class TestGetSQLAlchemyTypes(unittest.TestCase):
+    """Tests for ingest.get_sqlalchemy_types"""
+
+    col_types = {
+        "i8": "TINYINT",
+        "i32": "INT",
+        "i64": "BIGINT",
+        "u8": "TINYINT UNSIGNED",
+        "u16": "SMALLINT UNSIGNED",
+        "u32": "INT UNSIGNED",
+        "u64": "BIGINT UNSIGNED",
+        "f32": "FLOAT",
+        "f64": "DOUBLE",
+        "b": "BOOLEAN",
+        "s": "VARCHAR(12)",
+    }
+
+    def compile_types(self, dialect):
+        """Compile the column types of a table using all of col_types"""
+
+        sqltypes = ingest.get_sqlalchemy_types(dict(self.col_types))
+        table = Table("t", MetaData(), *[Column(k, v) for k, v in sqltypes.items()])
+        ddl = str(CreateTable(table).compile(dialect=dialect))
+        lines = [line.strip().rstrip(",") for line in ddl.split("\n")[2:-3]]
+
+        return dict(line.split(" ", 1) for line in lines)
+
+    def test_mysql(self):
+        """MySQL uses unsigned types"""
+
+        self.assertEqual(
+            self.compile_types(mysql.dialect()),
+            {
+                "i8": "SMALLINT",
+                "i32": "INTEGER",
+                "i64": "BIGINT",
+                "u8": "TINYINT UNSIGNED",
+                "u16": "SMALLINT UNSIGNED",
+                "u32": "INTEGER UNSIGNED",
+                "u64": "BIGINT UNSIGNED",
+                "f32": "FLOAT",
+                "f64": "DOUBLE",
+                "b": "BOOL",
+                "s": "VARCHAR(12)",
+            },
+        )
+
+    def test_other_dialects(self):
+        """Other dialects use signed types wide enough for unsigned values"""
+
+        res = self.compile_types(sqlite.dialect())
+        self.assertEqual(res["u8"], "SMALLINT")
+        self.assertEqual(res["u16"], "INTEGER")
+        self.assertEqual(res["u32"], "BIGINT")
+        self.assertEqual(res["u64"], "BIGINT")
+
+        df = pandas.DataFrame(
+            {
+                "u8": np.array([0, 255], dtype=np.uint8),
+                "u32": np.array([0, 4294967295], dtype=np.int64),
+                "f": np.array([0.5, 1.5], dtype=np.float32),
+            }
+        )
+        dtype = ingest.get_sqlalchemy_types(ingest.get_optimal_sql_datatypes(df))
+        engine = create_engine("sqlite://")
+        df.to_sql("t", engine, dtype=dtype, index=False)
+        out = pandas.read_sql_table("t", engine)
+        self.assertEqual(out["u32"].tolist(), [0, 4294967295])
+        self.assertIsInstance(dtype["u8"], types.TypeEngine)
+
+
+class TestUpdateSQLschema(unittest.TestCase):
+    """Tests for ingest.updateSQLschema"""
+
+    create_table = "\n".join(
+        [
+            "CREATE TABLE `Scenarios` (",
+            "  `scenario_name` text,",
+            '  `r_as` double DEFAULT NULL COMMENT "Separation",',
+            "  `contrast` double DEFAULT NULL,",
+            "  `extra` bigint DEFAULT NULL,",
+            "  KEY `ix_scenario` (`scenario_name`(16))",
+            ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4",
+        ]
+    )
+
+    def test_comments(self):
+        """All comments are set in one ALTER, with warnings for mismatches"""
+
+        schema = pandas.DataFrame(
+            {
+                "Column": ["scenario_name", "r_as", "contrast", "dMag"],
+                "Comments": ["Scenario name", "Separation", "Contrast", "dMag"],
+                "Index": [0, 0, 0, 0],
+                "ForeignKey": [np.nan] * 4,
+            }
+        )
+        connection = _Connection({}, create_table=self.create_table)
+        with self.assertWarns(UserWarning) as cm:
+            ingest.updateSQLschema(connection, "Scenarios", schema)
+
+        messages = [str(w.message) for w in cm.warnings]
+        self.assertEqual(
+            messages,
+            [
+                "Columns present in table but missing from schema: extra",
+                "Columns present in schema but missing from table (or already have "
+                "comments): r_as,dMag",
+            ],
+        )
+
+        alters = [s for s in connection.statements if s.startswith("ALTER")]
+        self.assertEqual(
+            alters,
+            [
+                "ALTER TABLE `Scenarios` "
+                'CHANGE `scenario_name` `scenario_name` text COMMENT "Scenario name", '
+                "CHANGE `contrast` `contrast` double DEFAULT NULL "
+                'COMMENT "Contrast";'
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()